@@ -3,19 +3,27 @@ Live Ad Detection - API Server
 Coordinates cluster nodes and provides REST API for management
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, IPvAnyAddress
+from typing import List, Literal, Optional, Dict, Any
+from datetime import datetime, timedelta
 import logging
+import orjson
 import os
+import threading
+import time
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, text, insert, select, update, delete, literal, bindparam, and_, true, tuple_, table, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from database import (
     init_db,
     get_db,
+    get_heartbeat_db,
+    engine,
+    SessionLocal,
     DBNode,
     DBDetection,
     DBNodeStats,
@@ -27,21 +35,163 @@ from database import (
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
+# Node configs are polled by every node but rarely change; cache them per
+# process for a short time (node_id -> (expires_at, config)).
+CONFIG_CACHE_TTL = float(os.getenv("CONFIG_CACHE_TTL", "30"))
+_config_cache: Dict[str, tuple] = {}
+
+# Node stats responses: fresh for the first half of the TTL, then served
+# stale while a background task recomputes them
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "60"))
+# Keys are (node_id, hours); past this many entries expired ones are swept,
+# then the oldest dropped
+STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "1024"))
+_stats_cache: Dict[tuple, tuple] = {}
+
+# Stats windows longer than this are served from the hourly rollup
+STATS_RAW_HOURS = int(os.getenv("STATS_RAW_HOURS", "48"))
+# Longest stats window a client may request
+STATS_MAX_HOURS = int(os.getenv("STATS_MAX_HOURS", "2160"))  # 90 days
+
+# Stats computations in progress; concurrent misses for the same key wait on
+# the first caller's Event instead of running the same aggregation again
+_stats_inflight: Dict[tuple, threading.Event] = {}
+_stats_inflight_lock = threading.Lock()
+
+# Cluster status is polled by the dashboard; its counts scan whole tables,
+# so a few seconds of staleness saves most of that work
+CLUSTER_STATUS_CACHE_TTL = float(os.getenv("CLUSTER_STATUS_CACHE_TTL", "10"))
+_cluster_status_cache: Optional[tuple] = None
+
+# Largest detection batch accepted in one request (one INSERT, one
+# transaction); bigger backlogs are sent as several batches
+DETECTION_BATCH_MAX = int(os.getenv("DETECTION_BATCH_MAX", "500"))
+
+# Rows fetched (and written to the client) per batch when streaming lists
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+# How often the hourly rollups (postgres/init.sql) are refreshed and upcoming
+# node_stats partitions are created
+ROLLUP_REFRESH_INTERVAL = float(os.getenv("ROLLUP_REFRESH_INTERVAL", "300"))
+# Each rollup pass re-aggregates from this far before the previous pass, so
+# rows stamped before a pass but committed after it are still picked up (as
+# long as no writing transaction runs longer than this)
+ROLLUP_OVERLAP = timedelta(seconds=float(os.getenv("ROLLUP_OVERLAP", "60")))
+
 app = FastAPI(
     title="Live Ad Detection API",
     description="API for managing ad detection cluster",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
+# Browser origins allowed to call the API (the dashboard), comma-separated
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",") if o.strip()]
+
+class NodeAwareCORSMiddleware(CORSMiddleware):
+    """CORS middleware that passes node-only endpoints straight through"""
+
+    # Called by cluster nodes at heartbeat rate, never by a browser
+    NODE_PATHS = frozenset(("/health", "/api/v1/nodes/register", "/api/v1/detections/batch"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path in self.NODE_PATHS or path.endswith("/heartbeat"):
+                await self.app(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
+
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
+    NodeAwareCORSMiddleware,
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# PostgreSQL upkeep run by the maintenance thread, in order; each group of
+# statements is one transaction, so a rollup's watermark (database clock)
+# only moves with the pass that brought it up to date.
+DB_MAINTENANCE_STATEMENTS = (
+    (
+        # Rebuild each hour that received detections since the watermark
+        # (node timestamps arrive late): clear its rows and re-count it.
+        # Delete-and-insert rather than an upsert: detached rows (node_id
+        # NULL) never conflict, so an upsert would add them a second time
+        """
+        WITH touched AS (
+            SELECT DISTINCT date_trunc('hour', timestamp) AS hour
+            FROM detections
+            WHERE created_at >= (
+                SELECT refreshed_at - :overlap
+                FROM rollup_watermarks WHERE name = 'detections_hourly'
+            )
+        ), cleared AS (
+            DELETE FROM detections_hourly WHERE hour IN (SELECT hour FROM touched)
+        )
+        INSERT INTO detections_hourly (node_id, hour, detections, last_detection)
+        SELECT d.node_id, touched.hour, COUNT(*), MAX(d.timestamp)
+        FROM touched
+        JOIN detections d
+            ON d.timestamp >= touched.hour AND d.timestamp < touched.hour + INTERVAL '1 hour'
+        GROUP BY d.node_id, touched.hour
+        """,
+        "UPDATE rollup_watermarks SET refreshed_at = LOCALTIMESTAMP WHERE name = 'detections_hourly'"
+    ),
+    (
+        # Upsert only the hours from the watermark on; earlier hours are final
+        """
+        INSERT INTO node_stats_hourly
+        SELECT
+            node_id,
+            date_trunc('hour', timestamp),
+            AVG(cpu_usage),
+            AVG(memory_usage),
+            AVG(disk_usage),
+            MAX(network_bytes_sent),
+            MAX(network_bytes_recv),
+            AVG(temperature),
+            COUNT(*)
+        FROM node_stats
+        WHERE timestamp >= (
+            SELECT date_trunc('hour', refreshed_at - :overlap)
+            FROM rollup_watermarks WHERE name = 'node_stats_hourly'
+        )
+        GROUP BY node_id, date_trunc('hour', timestamp)
+        ON CONFLICT (node_id, hour) DO UPDATE SET
+            cpu_usage = EXCLUDED.cpu_usage,
+            memory_usage = EXCLUDED.memory_usage,
+            disk_usage = EXCLUDED.disk_usage,
+            network_bytes_sent = EXCLUDED.network_bytes_sent,
+            network_bytes_recv = EXCLUDED.network_bytes_recv,
+            temperature = EXCLUDED.temperature,
+            samples = EXCLUDED.samples
+        """,
+        "UPDATE rollup_watermarks SET refreshed_at = LOCALTIMESTAMP WHERE name = 'node_stats_hourly'"
+    ),
+    ("SELECT ensure_node_stats_partitions()",)
+)
+
+def _run_db_maintenance():
+    """
+    Periodic PostgreSQL upkeep (runs in a daemon thread): refresh the hourly
+    rollups and pre-create upcoming node_stats partitions. Runs once right
+    away so a restart after downtime doesn't wait a full interval.
+    """
+    while True:
+        for statements in DB_MAINTENANCE_STATEMENTS:
+            try:
+                with engine.connect() as conn:
+                    conn.execution_options(isolation_level="REPEATABLE READ")
+                    with conn.begin():
+                        for statement in statements:
+                            conn.execute(text(statement), {"overlap": ROLLUP_OVERLAP})
+            except Exception as e:
+                logger.error("DB maintenance failed (%s): %s", statements[-1], e)
+        time.sleep(ROLLUP_REFRESH_INTERVAL)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -50,6 +200,8 @@ async def startup_event():
     init_db()
     logger.info("Database initialized")
 
+    threading.Thread(target=_run_db_maintenance, daemon=True).start()
+
 # Models
 class NodeInfo(BaseModel):
     node_id: str
@@ -64,8 +216,8 @@ class NodeInfo(BaseModel):
 
 class NodeRegistration(BaseModel):
     node_name: str
-    ip_address: str
-    role: str
+    ip_address: IPvAnyAddress  # stored in an INET column; malformed input is a 422
+    role: Literal["head", "node"]  # mirrors the nodes.role CHECK constraint
     capabilities: Dict[str, Any] = {}
 
 class Detection(BaseModel):
@@ -76,6 +228,9 @@ class Detection(BaseModel):
     ad_type: str
     metadata: Dict[str, Any] = {}
 
+class DetectionOut(Detection):
+    node_id: Optional[str]  # None once the reporting node is unregistered
+
 class ClusterStatus(BaseModel):
     total_nodes: int
     online_nodes: int
@@ -94,42 +249,160 @@ async def health_check():
     }
 
 # Node Management
+
+# Columns backing NodeInfo; selected/returned directly to skip ORM hydration
+NODE_INFO_COLUMNS = (
+    DBNode.node_id,
+    DBNode.node_name,
+    DBNode.ip_address,
+    DBNode.role,
+    DBNode.status,
+    DBNode.last_seen,
+    DBNode.cpu_usage,
+    DBNode.memory_usage,
+    DBNode.disk_usage
+)
+
+# Columns backing DetectionOut; same idea as NODE_INFO_COLUMNS
+DETECTION_COLUMNS = (
+    DBDetection.detection_id,
+    DBDetection.node_id,
+    DBDetection.timestamp,
+    DBDetection.confidence,
+    DBDetection.ad_type,
+    DBDetection.metadata
+)
+
+# Hot lookups built once at import; handlers only bind the key per call
+SELECT_NODE_INFO = select(*NODE_INFO_COLUMNS)\
+    .where(DBNode.node_id == bindparam("node_id"))
+SELECT_DETECTION = select(*DETECTION_COLUMNS)\
+    .where(DBDetection.detection_id == bindparam("detection_id"))
+# Outer joins: a matching parent with no children still returns one row
+SELECT_NODE_CONFIG = select(DBNode.id, DBConfig)\
+    .outerjoin(DBConfig, DBConfig.node_id == DBNode.node_id)\
+    .where(DBNode.node_id == bindparam("node_id"))
+SELECT_DETECTION_EVENTS = select(DBDetection.id, DBDetectionEvent)\
+    .outerjoin(DBDetectionEvent, DBDetectionEvent.detection_id == DBDetection.id)\
+    .where(DBDetection.detection_id == bindparam("detection_id"))\
+    .order_by(DBDetectionEvent.created_at.asc())
+SELECT_NODES = select(*NODE_INFO_COLUMNS)
+# Hourly node stats rollup (table in postgres/init.sql, kept current by the
+# maintenance thread)
+node_stats_hourly = table(
+    "node_stats_hourly",
+    column("node_id"),
+    column("hour"),
+    column("cpu_usage"),
+    column("memory_usage"),
+    column("disk_usage"),
+    column("network_bytes_sent"),
+    column("network_bytes_recv"),
+    column("temperature")
+)
+# Hourly detection rollup (table in postgres/init.sql, kept current by the
+# maintenance thread)
+detections_hourly = table(
+    "detections_hourly",
+    column("node_id"),
+    column("hour"),
+    column("detections"),
+    column("last_detection")
+)
+# Heartbeat writes: single UPDATE (rowcount doubles as the existence check)
+# plus the time-series row
+UPDATE_NODE_HEARTBEAT = update(DBNode)\
+    .where(DBNode.node_id == bindparam("key_node_id"))\
+    .values(
+        last_seen=bindparam("timestamp"),
+        status="online",
+        cpu_usage=bindparam("cpu_usage"),
+        memory_usage=bindparam("memory_usage"),
+        disk_usage=bindparam("disk_usage")
+    )\
+    .execution_options(synchronize_session=False)
+INSERT_NODE_STATS = insert(DBNodeStats)
+# The database cascades the node's stats and config and detaches its
+# detections (see postgres/init.sql), so this is the whole unregister
+DELETE_NODE = delete(DBNode)\
+    .where(DBNode.node_id == bindparam("key_node_id"))\
+    .execution_options(synchronize_session=False)
+# Cluster counts in one round trip: both tables are aggregated into
+# single-row subqueries (online count via COUNT(*) FILTER) joined ON TRUE
+_node_counts = select(
+    func.count().label("total_nodes"),
+    func.count().filter(DBNode.status == "online").label("online_nodes")
+).select_from(DBNode).subquery()
+# Total detections come from the hourly rollup instead of counting the whole
+# detections table. A detection the rollup may not hold yet was created (by
+# the database clock) after its last pass, less ROLLUP_OVERLAP; the hours
+# holding such detections are counted raw (created_at BRIN, then timestamp
+# index) and the rollup supplies every other hour, so none is counted twice.
+rollup_watermarks = table(
+    "rollup_watermarks",
+    column("name"),
+    column("refreshed_at")
+)
+_detections_touched_hours = select(
+    func.date_trunc("hour", DBDetection.timestamp).label("hour")
+).where(
+    DBDetection.created_at >= select(rollup_watermarks.c.refreshed_at - ROLLUP_OVERLAP)
+    .where(rollup_watermarks.c.name == "detections_hourly")
+    .scalar_subquery()
+).distinct().cte("detections_touched_hours")
+_detection_counts = select(
+    (
+        select(func.coalesce(func.sum(detections_hourly.c.detections), 0))
+        .where(detections_hourly.c.hour.not_in(select(_detections_touched_hours.c.hour)))
+        .scalar_subquery()
+        + select(func.count())
+        .select_from(DBDetection)
+        .join(_detections_touched_hours, and_(
+            DBDetection.timestamp >= _detections_touched_hours.c.hour,
+            DBDetection.timestamp < _detections_touched_hours.c.hour + timedelta(hours=1)
+        ))
+        .scalar_subquery()
+    ).label("total_detections"),
+    select(func.max(DBDetection.timestamp)).scalar_subquery().label("latest_detection")
+).subquery()
+SELECT_CLUSTER_COUNTS = select(_node_counts, _detection_counts)\
+    .select_from(_node_counts.join(_detection_counts, true()))
+
 @app.post("/api/v1/nodes/register", response_model=NodeInfo)
-async def register_node(node: NodeRegistration, db: Session = Depends(get_db)):
+def register_node(node: NodeRegistration, db: Session = Depends(get_db)):
     """Register a new node in the cluster"""
     node_id = f"{node.role}-{node.node_name}"
+    ip_address = str(node.ip_address)
+    now = datetime.now()
 
-    # Check if node already exists
-    existing_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
+    # Insert or refresh the node in a single INSERT ... ON CONFLICT
+    # (node_id) DO UPDATE ... RETURNING, instead of SELECT then INSERT/UPDATE
+    stmt = pg_insert(DBNode).values(
+        node_id=node_id,
+        node_name=node.node_name,
+        ip_address=ip_address,
+        role=node.role,
+        status="online",
+        last_seen=now,
+        cpu_usage=0.0,
+        memory_usage=0.0,
+        disk_usage=0.0,
+        metadata=node.capabilities  # Store capabilities in metadata field
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DBNode.node_id],
+        set_={
+            "ip_address": ip_address,
+            "status": "online",
+            "last_seen": now,
+            "metadata": node.capabilities
+        }
+    ).returning(*NODE_INFO_COLUMNS)
 
-    if existing_node:
-        # Update existing node
-        existing_node.ip_address = node.ip_address
-        existing_node.status = "online"
-        existing_node.last_seen = datetime.now()
-        existing_node.metadata = node.capabilities  # Store capabilities in metadata field
-        db.commit()
-        db.refresh(existing_node)
-        db_node = existing_node
-    else:
-        # Create new node
-        db_node = DBNode(
-            node_id=node_id,
-            node_name=node.node_name,
-            ip_address=node.ip_address,
-            role=node.role,
-            status="online",
-            last_seen=datetime.now(),
-            cpu_usage=0.0,
-            memory_usage=0.0,
-            disk_usage=0.0,
-            metadata=node.capabilities  # Store capabilities in metadata field
-        )
-        db.add(db_node)
-        db.commit()
-        db.refresh(db_node)
+    db_node = db.execute(stmt).one()
+    db.commit()
 
-    logger.info(f"Node registered: {node_id} at {node.ip_address}")
+    logger.info("Node registered: %s at %s", node_id, ip_address)
 
     return NodeInfo(
         node_id=db_node.node_id,
@@ -144,28 +417,19 @@ async def register_node(node: NodeRegistration, db: Session = Depends(get_db)):
     )
 
 @app.get("/api/v1/nodes", response_model=List[NodeInfo])
-async def list_nodes(db: Session = Depends(get_db)):
+def list_nodes(db: Session = Depends(get_db)):
     """List all registered nodes"""
-    db_nodes = db.query(DBNode).all()
-    return [
-        NodeInfo(
-            node_id=node.node_id,
-            node_name=node.node_name,
-            ip_address=node.ip_address,
-            role=node.role,
-            status=node.status,
-            last_seen=node.last_seen,
-            cpu_usage=node.cpu_usage,
-            memory_usage=node.memory_usage,
-            disk_usage=node.disk_usage
-        )
-        for node in db_nodes
-    ]
+    # Plain column tuples: skips ORM hydration and the metadata JSON blob.
+    # The columns already match NodeInfo, so the rows are encoded directly
+    # instead of building a NodeInfo per node that FastAPI would then
+    # validate a second time against response_model
+    db_nodes = db.execute(SELECT_NODES).all()
+    return ORJSONResponse([node._asdict() for node in db_nodes])
 
 @app.get("/api/v1/nodes/{node_id}", response_model=NodeInfo)
-async def get_node(node_id: str, db: Session = Depends(get_db)):
+def get_node(node_id: str, db: Session = Depends(get_db)):
     """Get information about a specific node"""
-    db_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
+    db_node = db.execute(SELECT_NODE_INFO, {"node_id": node_id}).first()
     if not db_node:
         raise HTTPException(status_code=404, detail="Node not found")
 
@@ -182,52 +446,56 @@ async def get_node(node_id: str, db: Session = Depends(get_db)):
     )
 
 @app.put("/api/v1/nodes/{node_id}/heartbeat")
-async def node_heartbeat(node_id: str, stats: Dict[str, float], db: Session = Depends(get_db)):
+def node_heartbeat(node_id: str, stats: Dict[str, float], db: Session = Depends(get_heartbeat_db)):
     """Update node heartbeat and statistics"""
-    db_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
-    if not db_node:
-        raise HTTPException(status_code=404, detail="Node not found")
-
     timestamp = datetime.now()
-    db_node.last_seen = timestamp
-    db_node.status = "online"
-    db_node.cpu_usage = stats.get("cpu_usage", 0.0)
-    db_node.memory_usage = stats.get("memory_usage", 0.0)
-    db_node.disk_usage = stats.get("disk_usage", 0.0)
 
-    # Store historical stats for time-series analytics
-    node_stats = DBNodeStats(
-        node_id=node_id,
-        timestamp=timestamp,
-        cpu_usage=stats.get("cpu_usage", 0.0),
-        memory_usage=stats.get("memory_usage", 0.0),
-        disk_usage=stats.get("disk_usage", 0.0),
-        network_bytes_sent=stats.get("network_bytes_sent"),
-        network_bytes_recv=stats.get("network_bytes_recv"),
-        temperature=stats.get("temperature")
-    )
-    db.add(node_stats)
+    usage = {
+        "timestamp": timestamp,
+        "cpu_usage": stats.get("cpu_usage", 0.0),
+        "memory_usage": stats.get("memory_usage", 0.0),
+        "disk_usage": stats.get("disk_usage", 0.0)
+    }
 
+    # Single UPDATE instead of SELECT + ORM flush; rowcount doubles as the
+    # existence check
+    updated = db.execute(UPDATE_NODE_HEARTBEAT, {"key_node_id": node_id, **usage}).rowcount
+    if not updated:
+        raise HTTPException(status_code=404, detail="Node not found")
+
+    # Store historical stats for time-series analytics
+    db.execute(INSERT_NODE_STATS, {
+        "node_id": node_id,
+        "network_bytes_sent": stats.get("network_bytes_sent"),
+        "network_bytes_recv": stats.get("network_bytes_recv"),
+        "temperature": stats.get("temperature"),
+        **usage
+    })
+
+    # Committed asynchronously: heartbeat sessions run with
+    # synchronous_commit=off (see database.get_heartbeat_db)
     db.commit()
 
     return {"status": "ok", "timestamp": timestamp}
 
 @app.delete("/api/v1/nodes/{node_id}")
-async def unregister_node(node_id: str, db: Session = Depends(get_db)):
+def unregister_node(node_id: str, db: Session = Depends(get_db)):
     """Unregister a node from the cluster"""
-    db_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
-    if not db_node:
+    # rowcount doubles as the existence check, as in node_heartbeat
+    if not db.execute(DELETE_NODE, {"key_node_id": node_id}).rowcount:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    db.delete(db_node)
     db.commit()
-    logger.info(f"Node unregistered: {node_id}")
+    _config_cache.pop(node_id, None)
+    for key in [key for key in list(_stats_cache) if key[0] == node_id]:
+        _stats_cache.pop(key, None)
+    logger.info("Node unregistered: %s", node_id)
 
     return {"status": "deleted", "node_id": node_id}
 
 # Detection Management
 @app.post("/api/v1/detections", response_model=Detection)
-async def report_detection(detection: Detection, db: Session = Depends(get_db)):
+def report_detection(detection: Detection, db: Session = Depends(get_db)):
     """Report a new ad detection from a node"""
     db_detection = DBDetection(
         detection_id=detection.detection_id,
@@ -239,42 +507,93 @@ async def report_detection(detection: Detection, db: Session = Depends(get_db)):
     )
     db.add(db_detection)
     db.commit()
-    db.refresh(db_detection)
 
-    logger.info(f"Detection reported from {detection.node_id}: {detection.ad_type} ({detection.confidence})")
+    logger.info("Detection reported from %s: %s (%s)", detection.node_id, detection.ad_type, detection.confidence)
     return detection
 
-@app.get("/api/v1/detections", response_model=List[Detection])
-async def list_detections(limit: int = 100, node_id: Optional[str] = None, db: Session = Depends(get_db)):
-    """List recent detections"""
-    query = db.query(DBDetection).order_by(desc(DBDetection.timestamp))
+@app.post("/api/v1/detections/batch")
+def report_detections(
+    detections: List[Detection] = Body(..., max_length=DETECTION_BATCH_MAX),
+    db: Session = Depends(get_db)
+):
+    """Report a batch of ad detections from a node (at most DETECTION_BATCH_MAX)"""
+    # One multi-row INSERT (executemany) instead of a request and an ORM
+    # flush per detection
+    if detections:
+        db.execute(DBDetection.__table__.insert(), [d.model_dump() for d in detections])
+        db.commit()
 
-    if node_id:
-        query = query.filter(DBDetection.node_id == node_id)
-
-    db_detections = query.limit(limit).all()
-
-    return [
-        Detection(
-            detection_id=d.detection_id,
-            node_id=d.node_id,
-            timestamp=d.timestamp,
-            confidence=d.confidence,
-            ad_type=d.ad_type,
-            metadata=d.metadata
-        )
-        for d in db_detections
-    ]
+    logger.info("Batch of %d detections reported", len(detections))
+    return {"status": "created", "count": len(detections)}
+
+@app.get("/api/v1/detections", response_model=List[DetectionOut])
+def list_detections(
+    limit: int = 100,
+    node_id: Optional[str] = None,
+    before_ts: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List recent detections, newest first.
+
+    Paginate by passing the timestamp and detection_id of the last detection
+    received as `before_ts` and `before_id`; each page is an index seek
+    rather than an OFFSET scan. Timestamps come from nodes and can repeat,
+    so detection_id breaks ties and no detection is skipped at a page
+    boundary. `before_ts` alone returns detections strictly older than it;
+    `before_id` without `before_ts` is rejected.
+    """
+    stmt = select(*DETECTION_COLUMNS)\
+        .order_by(desc(DBDetection.timestamp), desc(DBDetection.detection_id))
 
-@app.get("/api/v1/detections/{detection_id}", response_model=Detection)
-async def get_detection(detection_id: str, db: Session = Depends(get_db)):
+    if node_id:
+        stmt = stmt.where(DBDetection.node_id == node_id)
+
+    if before_id is not None and before_ts is None:
+        raise HTTPException(status_code=422, detail="before_id requires before_ts")
+
+    if before_ts:
+        if before_id is None:
+            stmt = stmt.where(DBDetection.timestamp < before_ts)
+        else:
+            stmt = stmt.where(
+                tuple_(DBDetection.timestamp, DBDetection.detection_id) < (before_ts, before_id)
+            )
+
+    # Stream the JSON array batch by batch so large pages don't have to be
+    # loaded and encoded in memory before the first byte goes out
+    result = db.execute(stmt.limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE))
+
+    def generate():
+        yield b"["
+        sep = b""
+        for batch in result.partitions():
+            yield sep + b",".join(
+                orjson.dumps({
+                    "detection_id": d.detection_id,
+                    "node_id": d.node_id,
+                    "timestamp": d.timestamp,
+                    "confidence": d.confidence,
+                    "ad_type": d.ad_type,
+                    "metadata": d.metadata
+                })
+                for d in batch
+            )
+            sep = b","
+        yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+@app.get("/api/v1/detections/{detection_id}", response_model=DetectionOut)
+def get_detection(detection_id: str, db: Session = Depends(get_db)):
     """Get details of a specific detection"""
-    db_detection = db.query(DBDetection).filter(DBDetection.detection_id == detection_id).first()
+    db_detection = db.execute(SELECT_DETECTION, {"detection_id": detection_id}).first()
 
     if not db_detection:
         raise HTTPException(status_code=404, detail="Detection not found")
 
-    return Detection(
+    return DetectionOut(
         detection_id=db_detection.detection_id,
         node_id=db_detection.node_id,
         timestamp=db_detection.timestamp,
@@ -285,38 +604,44 @@ async def get_detection(detection_id: str, db: Session = Depends(get_db)):
 
 # Cluster Status
 @app.get("/api/v1/cluster/status", response_model=ClusterStatus)
-async def get_cluster_status(db: Session = Depends(get_db)):
+def get_cluster_status(db: Session = Depends(get_db)):
     """Get overall cluster status"""
-    total_nodes = db.query(DBNode).count()
-    online_nodes = db.query(DBNode).filter(DBNode.status == "online").count()
-    offline_nodes = total_nodes - online_nodes
-
-    total_detections = db.query(DBDetection).count()
+    global _cluster_status_cache
+    if _cluster_status_cache and _cluster_status_cache[0] > time.monotonic():
+        return _cluster_status_cache[1]
 
-    # Get latest detection timestamp
-    latest_detection = db.query(func.max(DBDetection.timestamp)).scalar()
+    total_nodes, online_nodes, total_detections, latest_detection = \
+        db.execute(SELECT_CLUSTER_COUNTS).one()
+    offline_nodes = total_nodes - online_nodes
 
-    return ClusterStatus(
+    status = ClusterStatus(
         total_nodes=total_nodes,
         online_nodes=online_nodes,
         offline_nodes=offline_nodes,
         total_detections=total_detections,
         last_detection=latest_detection
     )
+    _cluster_status_cache = (time.monotonic() + CLUSTER_STATUS_CACHE_TTL, status)
+    return status
 
 # Configuration Management
 @app.get("/api/v1/config/{node_id}")
-async def get_node_config(node_id: str, db: Session = Depends(get_db)):
+def get_node_config(node_id: str, db: Session = Depends(get_db)):
     """Get configuration for a specific node"""
-    # Check if node exists
-    db_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
-    if not db_node:
+    cached = _config_cache.get(node_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    # Check node exists and fetch its stored config in one round trip
+    row = db.execute(SELECT_NODE_CONFIG, {"node_id": node_id}).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    # Get stored config or return default
-    db_config = db.query(DBConfig).filter(DBConfig.node_id == node_id).first()
+    # Use stored config or return default
+    db_config = row.DBConfig
 
     if db_config:
+        _config_cache[node_id] = (time.monotonic() + CONFIG_CACHE_TTL, db_config.config)
         return db_config.config
 
     # Return default config
@@ -331,36 +656,162 @@ async def get_node_config(node_id: str, db: Session = Depends(get_db)):
             "report_interval": 10
         }
     }
+    _config_cache[node_id] = (time.monotonic() + CONFIG_CACHE_TTL, default_config)
     return default_config
 
 @app.put("/api/v1/config/{node_id}")
-async def update_node_config(node_id: str, config: Dict[str, Any], db: Session = Depends(get_db)):
+def update_node_config(node_id: str, config: Dict[str, Any], db: Session = Depends(get_db)):
     """Update configuration for a specific node"""
-    # Check if node exists
-    db_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
-    if not db_node:
-        raise HTTPException(status_code=404, detail="Node not found")
-
-    # Update or create config
-    db_config = db.query(DBConfig).filter(DBConfig.node_id == node_id).first()
-
-    if db_config:
-        db_config.config = config
-        db_config.updated_at = datetime.now()
-    else:
-        db_config = DBConfig(node_id=node_id, config=config)
-        db.add(db_config)
+    # Nodes usually already have a config row, so try a single UPDATE first;
+    # only when nothing matched do we check the node and insert a new row
+    updated = db.query(DBConfig)\
+        .filter(DBConfig.node_id == node_id)\
+        .update({
+            DBConfig.config: config,
+            DBConfig.updated_at: datetime.now()
+        }, synchronize_session=False)
+
+    if not updated:
+        if not db.query(DBNode.id).filter(DBNode.node_id == node_id).first():
+            raise HTTPException(status_code=404, detail="Node not found")
+        # Upsert rather than a plain INSERT: a concurrent first write for the
+        # same node lands on the unique node_id and becomes an update
+        db.execute(
+            pg_insert(DBConfig)
+            .values(node_id=node_id, config=config)
+            .on_conflict_do_update(
+                index_elements=[DBConfig.node_id],
+                set_={"config": config, "updated_at": datetime.now()}
+            )
+        )
 
     db.commit()
-    logger.info(f"Config updated for {node_id}")
+    _config_cache.pop(node_id, None)
+    logger.info("Config updated for %s", node_id)
 
     return {"status": "updated", "config": config}
 
 # Analytics Endpoints
+def _compute_node_stats(db: Session, node_id: str, hours: int) -> Optional[Dict[str, Any]]:
+    """Build the node stats payload, or None if the node does not exist."""
+    # Get stats from the last N hours
+    since = datetime.now() - timedelta(hours=hours)
+
+    # Long windows read the hourly rollup: one point per hour instead of one
+    # per heartbeat
+    if hours > STATS_RAW_HOURS:
+        resolution = "hour"
+        source = node_stats_hourly
+        cols = node_stats_hourly.c
+        timestamp_col = node_stats_hourly.c.hour
+        since = since.replace(minute=0, second=0, microsecond=0)
+    else:
+        resolution = "raw"
+        source = cols = DBNodeStats
+        timestamp_col = DBNodeStats.timestamp
+
+    # Existence check and range scan in one query: the window condition sits
+    # in the join, so a node with no recent stats still yields one NULL row
+    rows = db.query(
+        DBNode.id,
+        timestamp_col,
+        cols.cpu_usage,
+        cols.memory_usage,
+        cols.disk_usage,
+        cols.network_bytes_sent,
+        cols.network_bytes_recv,
+        cols.temperature
+    ).outerjoin(source, and_(
+        cols.node_id == DBNode.node_id,
+        timestamp_col >= since
+    )).filter(DBNode.node_id == node_id)\
+        .order_by(timestamp_col.asc())\
+        .all()
+    if not rows:
+        _stats_cache.pop((node_id, hours), None)
+        return None
+
+    # Rows unpack positionally in select order (node id first), which skips
+    # Row's per-attribute name lookup for every field of every point
+    stats = [
+        {
+            "timestamp": timestamp.isoformat(),
+            "cpu_usage": cpu_usage,
+            "memory_usage": memory_usage,
+            "disk_usage": disk_usage,
+            "network_bytes_sent": network_bytes_sent,
+            "network_bytes_recv": network_bytes_recv,
+            "temperature": temperature
+        }
+        for (_, timestamp, cpu_usage, memory_usage, disk_usage,
+             network_bytes_sent, network_bytes_recv, temperature) in rows
+        if timestamp is not None
+    ]
+
+    payload = {
+        "node_id": node_id,
+        "period_hours": hours,
+        "resolution": resolution,
+        "data_points": len(stats),
+        "stats": stats
+    }
+    if len(_stats_cache) >= STATS_CACHE_MAX_ENTRIES:
+        _evict_stats_cache()
+    _stats_cache[(node_id, hours)] = (time.monotonic(), payload)
+    return payload
+
+def _evict_stats_cache():
+    """Make room in the stats cache: drop expired entries, then the oldest."""
+    entries = sorted(list(_stats_cache.items()), key=lambda item: item[1][0])
+    expired_before = time.monotonic() - STATS_CACHE_TTL
+    excess = len(entries) - STATS_CACHE_MAX_ENTRIES + 1
+    for i, (key, (computed_at, _)) in enumerate(entries):
+        if computed_at >= expired_before and i >= excess:
+            break
+        _stats_cache.pop(key, None)
+
+def _load_node_stats(db: Session, node_id: str, hours: int, wait: bool = True) -> Optional[Dict[str, Any]]:
+    """Compute node stats once per key across concurrent callers."""
+    key = (node_id, hours)
+    with _stats_inflight_lock:
+        flight = _stats_inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _stats_inflight[key] = threading.Event()
+
+    if not leader:
+        if not wait:
+            return None
+        flight.wait()
+        cached = _stats_cache.get(key)
+        if cached and time.monotonic() - cached[0] < STATS_CACHE_TTL:
+            return cached[1]
+        # The leader failed, found no node or left an expired entry; answer
+        # for ourselves
+        return _compute_node_stats(db, node_id, hours)
+
+    try:
+        return _compute_node_stats(db, node_id, hours)
+    finally:
+        with _stats_inflight_lock:
+            del _stats_inflight[key]
+        flight.set()
+
+def _refresh_node_stats(node_id: str, hours: int):
+    """Recompute a cached stats payload outside the request that served it."""
+    db = SessionLocal()
+    try:
+        _load_node_stats(db, node_id, hours, wait=False)
+    except Exception as e:
+        logger.error("Failed to refresh stats for %s: %s", node_id, e)
+    finally:
+        db.close()
+
 @app.get("/api/v1/analytics/nodes/{node_id}/stats")
-async def get_node_stats(
+def get_node_stats(
     node_id: str,
-    hours: int = 24,
+    background_tasks: BackgroundTasks,
+    hours: int = Query(24, ge=1, le=STATS_MAX_HOURS),
     db: Session = Depends(get_db)
 ):
     """
@@ -368,54 +819,34 @@ async def get_node_stats(
 
     Args:
         node_id: Node identifier
-        hours: Number of hours of historical data (default: 24)
+        hours: Number of hours of historical data (default: 24, at most
+            STATS_MAX_HOURS)
     """
-    # Check if node exists
-    db_node = db.query(DBNode).filter(DBNode.node_id == node_id).first()
-    if not db_node:
+    cached = _stats_cache.get((node_id, hours))
+    if cached:
+        age = time.monotonic() - cached[0]
+        if age < STATS_CACHE_TTL / 2:
+            return cached[1]
+        if age < STATS_CACHE_TTL:
+            background_tasks.add_task(_refresh_node_stats, node_id, hours)
+            return cached[1]
+
+    payload = _load_node_stats(db, node_id, hours)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    # Get stats from the last N hours
-    from datetime import timedelta
-    since = datetime.now() - timedelta(hours=hours)
-
-    stats = db.query(DBNodeStats)\
-        .filter(DBNodeStats.node_id == node_id)\
-        .filter(DBNodeStats.timestamp >= since)\
-        .order_by(DBNodeStats.timestamp.asc())\
-        .all()
-
-    return {
-        "node_id": node_id,
-        "period_hours": hours,
-        "data_points": len(stats),
-        "stats": [
-            {
-                "timestamp": s.timestamp.isoformat(),
-                "cpu_usage": s.cpu_usage,
-                "memory_usage": s.memory_usage,
-                "disk_usage": s.disk_usage,
-                "network_bytes_sent": s.network_bytes_sent,
-                "network_bytes_recv": s.network_bytes_recv,
-                "temperature": s.temperature
-            }
-            for s in stats
-        ]
-    }
+    return payload
 
 @app.get("/api/v1/analytics/detections/{detection_id}/events")
-async def get_detection_events(detection_id: str, db: Session = Depends(get_db)):
+def get_detection_events(detection_id: str, db: Session = Depends(get_db)):
     """Get events associated with a detection (for analytics)."""
-    # Find detection by detection_id string
-    detection = db.query(DBDetection).filter(DBDetection.detection_id == detection_id).first()
-    if not detection:
+    # Resolve the detection and fetch its events in one round trip; a
+    # detection with no events still yields one row (with a NULL event)
+    rows = db.execute(SELECT_DETECTION_EVENTS, {"detection_id": detection_id}).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Detection not found")
 
-    # Get all events for this detection
-    events = db.query(DBDetectionEvent)\
-        .filter(DBDetectionEvent.detection_id == detection.id)\
-        .order_by(DBDetectionEvent.created_at.asc())\
-        .all()
+    events = [row.DBDetectionEvent for row in rows if row.DBDetectionEvent is not None]
 
     return {
         "detection_id": detection_id,
@@ -431,25 +862,26 @@ async def get_detection_events(detection_id: str, db: Session = Depends(get_db))
     }
 
 @app.post("/api/v1/analytics/detections/{detection_id}/events")
-async def create_detection_event(
+def create_detection_event(
     detection_id: str,
     event_type: str,
     event_data: Optional[Dict[str, Any]] = None,
     db: Session = Depends(get_db)
 ):
     """Create an event for a detection (for analytics tracking)."""
-    # Find detection by detection_id string
-    detection = db.query(DBDetection).filter(DBDetection.detection_id == detection_id).first()
-    if not detection:
+    # Resolve the detection_id string and insert the event in one
+    # INSERT ... SELECT ... RETURNING; no row back means no such detection
+    stmt = insert(DBDetectionEvent).from_select(
+        ["detection_id", "event_type", "event_data"],
+        select(
+            DBDetection.id,
+            literal(event_type),
+            literal(event_data or {}, DBDetectionEvent.event_data.type)
+        ).where(DBDetection.detection_id == detection_id)
+    ).returning(DBDetectionEvent.id)
+
+    if db.execute(stmt).first() is None:
         raise HTTPException(status_code=404, detail="Detection not found")
-
-    # Create event
-    event = DBDetectionEvent(
-        detection_id=detection.id,
-        event_type=event_type,
-        event_data=event_data or {}
-    )
-    db.add(event)
     db.commit()
 
     return {
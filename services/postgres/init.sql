@@ -3,12 +3,18 @@
 -- Create extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
--- Nodes table
+-- Nodes table. Unregistering a node is a single DELETE: its stats and
+-- config follow via ON DELETE CASCADE, while its detections (and their
+-- events) are kept with node_id set to NULL.
+-- Every heartbeat rewrites last_seen/status/usage, none of which are
+-- indexed; leaving 30% of each page free lets those updates be
+-- HOT (new row version on the same page, no index entries touched)
+-- instead of bloating the node_id index on every poll.
 CREATE TABLE IF NOT EXISTS nodes (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     node_id VARCHAR(255) UNIQUE NOT NULL,
-    node_name VARCHAR(255) NOT NULL,
-    ip_address VARCHAR(45) NOT NULL,
+    node_name TEXT NOT NULL,
+    ip_address INET NOT NULL,
     role VARCHAR(50) NOT NULL,
     status VARCHAR(50) NOT NULL DEFAULT 'offline',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -16,39 +22,70 @@ CREATE TABLE IF NOT EXISTS nodes (
     cpu_usage FLOAT DEFAULT 0,
     memory_usage FLOAT DEFAULT 0,
     disk_usage FLOAT DEFAULT 0,
-    metadata JSONB
-);
+    metadata JSONB,
+    -- Strings + CHECK instead of ENUM types: adding a value is a constraint
+    -- swap rather than a transaction-unsafe ALTER TYPE ... ADD VALUE
+    CONSTRAINT ck_nodes_role CHECK (role IN ('head', 'node')),
+    CONSTRAINT ck_nodes_status CHECK (status IN ('online', 'offline', 'error'))
+) WITH (fillfactor = 70);
 
 -- Detections table
 CREATE TABLE IF NOT EXISTS detections (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     detection_id VARCHAR(255) UNIQUE NOT NULL,
-    node_id VARCHAR(255) REFERENCES nodes(node_id),
+    node_id VARCHAR(255) REFERENCES nodes(node_id) ON DELETE SET NULL,
     timestamp TIMESTAMP NOT NULL,
     confidence FLOAT NOT NULL,
-    ad_type VARCHAR(100) NOT NULL,
+    ad_type TEXT NOT NULL,
     metadata JSONB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Node statistics (time series)
+-- Node statistics (time series), range-partitioned by month so time-window
+-- queries only touch the months they cover and old months can be dropped
+-- whole. The partition key has to be part of the primary key.
 CREATE TABLE IF NOT EXISTS node_stats (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    node_id VARCHAR(255) REFERENCES nodes(node_id),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    node_id VARCHAR(255) REFERENCES nodes(node_id) ON DELETE CASCADE,
     timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     cpu_usage FLOAT,
     memory_usage FLOAT,
     disk_usage FLOAT,
     network_bytes_sent BIGINT,
     network_bytes_recv BIGINT,
-    temperature FLOAT
-);
+    temperature FLOAT,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside the pre-created months
+CREATE TABLE IF NOT EXISTS node_stats_default PARTITION OF node_stats DEFAULT;
+
+-- Creates monthly partitions from the current month through months_ahead;
+-- called here and periodically by the API server's maintenance thread
+CREATE OR REPLACE FUNCTION ensure_node_stats_partitions(months_ahead INT DEFAULT 2)
+RETURNS void AS $$
+DECLARE
+    month_start DATE;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_start := (date_trunc('month', now()) + make_interval(months => i))::DATE;
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF node_stats FOR VALUES FROM (%L) TO (%L)',
+            'node_stats_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::DATE
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_node_stats_partitions();
 
 -- Detection events (for analytics)
 CREATE TABLE IF NOT EXISTS detection_events (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     detection_id UUID REFERENCES detections(id),
-    event_type VARCHAR(100) NOT NULL,
+    event_type TEXT NOT NULL,
     event_data JSONB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -56,19 +93,81 @@ CREATE TABLE IF NOT EXISTS detection_events (
 -- Configuration storage
 CREATE TABLE IF NOT EXISTS node_configs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    node_id VARCHAR(255) REFERENCES nodes(node_id),
+    node_id VARCHAR(255) REFERENCES nodes(node_id) ON DELETE CASCADE,
     config JSONB NOT NULL,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create indexes
-CREATE INDEX idx_detections_node_id ON detections(node_id);
-CREATE INDEX idx_detections_timestamp ON detections(timestamp);
-CREATE INDEX idx_node_stats_node_id ON node_stats(node_id);
-CREATE INDEX idx_node_stats_timestamp ON node_stats(timestamp);
+-- The detection list pages on (timestamp, detection_id) (timestamps come
+-- from nodes and can repeat); detection_id is the tie-breaker in both
+CREATE INDEX idx_detections_node_id_timestamp ON detections(node_id, timestamp, detection_id);
+CREATE INDEX idx_detections_timestamp ON detections(timestamp, detection_id);
+-- Detections are appended in created_at order: BRIN finds the ones created
+-- since the last rollup refresh (see rollup_watermarks)
+CREATE INDEX idx_detections_created_at ON detections USING brin(created_at);
+-- Serves a node's stats window (node_id filter + timestamp range/order) as
+-- an index-only scan: the payload columns ride along in INCLUDE, so the
+-- heap is never visited; also covers plain node_id lookups
+CREATE INDEX idx_node_stats_node_id_timestamp ON node_stats(node_id, timestamp)
+    INCLUDE (cpu_usage, memory_usage, disk_usage, network_bytes_sent, network_bytes_recv, temperature);
+-- Stats rows arrive in timestamp order, so a BRIN index (one min/max summary
+-- per block range) answers time-window scans at a fraction of a B-tree's
+-- size and insert cost
+CREATE INDEX idx_node_stats_timestamp ON node_stats USING brin(timestamp);
 CREATE INDEX idx_detection_events_detection_id ON detection_events(detection_id);
+-- One config row per node: enforces the invariant the config endpoints
+-- assume and turns their node_id lookup into a unique index probe
+CREATE UNIQUE INDEX idx_node_configs_node_id ON node_configs(node_id);
+
+-- Create rollups and views
+
+-- When each rollup was last brought up to date (database clock), written in
+-- the same transaction as the pass that did it. Exact detection totals take
+-- the hours that received detections since the watermark from detections
+-- and every other hour from the rollup.
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    refreshed_at TIMESTAMP NOT NULL
+);
+
+INSERT INTO rollup_watermarks (name, refreshed_at)
+VALUES ('detections_hourly', '-infinity'), ('node_stats_hourly', '-infinity')
+ON CONFLICT (name) DO NOTHING;
+
+-- Hourly detection rollup per node, kept current by the API server
+-- (ROLLUP_REFRESH_INTERVAL) so reporting queries don't rescan detections.
+-- Node timestamps can arrive late, so each pass rebuilds just the hours
+-- that received detections since the watermark. Rows of an unregistered
+-- node are detached like its detections (node_id NULL).
+CREATE TABLE IF NOT EXISTS detections_hourly (
+    node_id VARCHAR(255) REFERENCES nodes(node_id) ON DELETE SET NULL,
+    hour TIMESTAMP NOT NULL,
+    detections BIGINT NOT NULL,
+    last_detection TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_detections_hourly_node_id_hour ON detections_hourly(node_id, hour);
+CREATE INDEX IF NOT EXISTS idx_detections_hourly_hour ON detections_hourly(hour);
+
+-- Hourly node stats rollup; long stats windows in the API read this instead
+-- of every heartbeat row (network counters are cumulative, so MAX is the
+-- value at the end of the hour). The API server's maintenance thread keeps
+-- it current by re-aggregating only the hours from its watermark on.
+CREATE TABLE IF NOT EXISTS node_stats_hourly (
+    node_id VARCHAR(255) NOT NULL REFERENCES nodes(node_id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    cpu_usage FLOAT,
+    memory_usage FLOAT,
+    disk_usage FLOAT,
+    network_bytes_sent BIGINT,
+    network_bytes_recv BIGINT,
+    temperature FLOAT,
+    samples BIGINT NOT NULL,
+    PRIMARY KEY (node_id, hour)
+);
 
--- Create views
+-- Detection totals come from the rollup; node status fields are live
 CREATE OR REPLACE VIEW node_summary AS
 SELECT
     n.node_id,
@@ -76,10 +175,10 @@ SELECT
     n.role,
     n.status,
     n.last_seen,
-    COUNT(DISTINCT d.id) as total_detections,
-    MAX(d.timestamp) as last_detection
+    COALESCE(SUM(h.detections), 0)::BIGINT as total_detections,
+    MAX(h.last_detection) as last_detection
 FROM nodes n
-LEFT JOIN detections d ON n.node_id = d.node_id
+LEFT JOIN detections_hourly h ON n.node_id = h.node_id
 GROUP BY n.node_id, n.node_name, n.role, n.status, n.last_seen;
 
 -- Insert sample data (optional, for testing)
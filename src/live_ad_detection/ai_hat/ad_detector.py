@@ -2,7 +2,10 @@
 
 import logging
 import time
+import heapq
 import numpy as np
+from collections import deque
+from itertools import chain
 from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 from dataclasses import dataclass, asdict
@@ -92,7 +95,7 @@ class AdDetector:
         }
 
         self.is_running = False
-        self.last_detections: Dict[str, List[Detection]] = {}
+        self.last_detections: Dict[str, deque] = {}
 
     def initialize(self) -> bool:
         """
@@ -230,7 +233,7 @@ class AdDetector:
             if self.paused_streams.get(stream_id, False):
                 return
 
-            start_time = time.time()
+            start_time = time.perf_counter()
 
             # Run inference using model manager
             current_model = self.model_manager.get_current_model()
@@ -244,7 +247,7 @@ class AdDetector:
 
             # Update statistics
             self.stats["total_frames_processed"] += 1
-            inference_time = (time.time() - start_time) * 1000
+            inference_time = (time.perf_counter() - start_time) * 1000
             self.stats["inference_time_ms"] = inference_time
 
             # Process each detection
@@ -350,19 +353,16 @@ class AdDetector:
             self.stats["detections_by_stream"][stream_id] = 0
         self.stats["detections_by_stream"][stream_id] += 1
 
-        # Store recent detections
+        # Store recent detections (bounded deque keeps only the last 100
+        # per stream without re-slicing the list on every detection)
         if stream_id not in self.last_detections:
-            self.last_detections[stream_id] = []
+            self.last_detections[stream_id] = deque(maxlen=100)
         self.last_detections[stream_id].append(detection)
 
-        # Keep only last 100 detections per stream
-        if len(self.last_detections[stream_id]) > 100:
-            self.last_detections[stream_id] = self.last_detections[stream_id][-100:]
-
         # Log detection
         logger.info(
-            f"Ad detected on {stream_id}: {detection.ad_type} "
-            f"(confidence: {detection.confidence:.2f})"
+            "Ad detected on %s: %s (confidence: %.2f)",
+            stream_id, detection.ad_type, detection.confidence
         )
 
         # Call user callback if provided
@@ -468,17 +468,20 @@ class AdDetector:
         Returns:
             List of recent Detection objects
         """
+        # The processing thread appends while callers (web UI, API) read, and
+        # iterating a deque that is being mutated raises; list()/tuple() copy
+        # each buffer in one step under the GIL, so read from those snapshots
         if stream_id:
-            detections = self.last_detections.get(stream_id, [])
-        else:
-            # Combine all streams
-            detections = []
-            for stream_detections in self.last_detections.values():
-                detections.extend(stream_detections)
-            # Sort by timestamp
-            detections.sort(key=lambda d: d.timestamp, reverse=True)
-
-        return detections[:limit]
+            return list(self.last_detections.get(stream_id, ()))[:limit]
+
+        # Newest across all streams; selects the top `limit` without sorting
+        # every buffered detection
+        snapshots = [tuple(d) for d in list(self.last_detections.values())]
+        return heapq.nlargest(
+            limit,
+            chain.from_iterable(snapshots),
+            key=lambda d: d.timestamp
+        )
 
     def cleanup(self):
         """Clean up all resources."""
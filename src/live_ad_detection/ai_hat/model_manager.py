@@ -13,6 +13,10 @@ from .hailo_inference import HailoInference
 
 logger = logging.getLogger(__name__)
 
+# Read size for model checksums; large blocks keep hashlib (and its
+# SHA extensions) busy instead of paying Python call overhead per block.
+_SHA_CHUNK = 8 << 20  # 8 MiB
+
 
 class ModelManager:
     """
@@ -33,8 +37,9 @@ class ModelManager:
         Args:
             model_dir: Directory containing model files
         """
+        # Created on first use (see watch_for_updates) so constructing a
+        # manager has no filesystem side effects
         self.model_dir = Path(model_dir)
-        self.model_dir.mkdir(parents=True, exist_ok=True)
 
         self.current_model: Optional[HailoInference] = None
         self.current_model_path: Optional[str] = None
@@ -281,6 +286,7 @@ class ModelManager:
         """
         logger.info(f"Watching for model updates in: {self.model_dir}")
 
+        self.model_dir.mkdir(parents=True, exist_ok=True)
         known_models = set(self.model_dir.glob("*.hef"))
 
         while True:
@@ -352,11 +358,14 @@ class ModelManager:
 
     def _calculate_checksum(self, file_path: str) -> str:
         """Calculate SHA256 checksum of file."""
-        sha256 = hashlib.sha256()
-
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha256.update(chunk)
+        with open(file_path, 'rb', buffering=0) as f:
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: hashes in C and releases the GIL
+                sha256 = hashlib.file_digest(f, 'sha256')
+            else:
+                sha256 = hashlib.sha256()
+                for chunk in iter(lambda: f.read(_SHA_CHUNK), b''):
+                    sha256.update(chunk)
 
         return sha256.hexdigest()[:16]  # First 16 chars
 
@@ -139,7 +139,9 @@ class VideoStream:
         """Main capture loop running in a separate thread."""
         logger.info(f"Capture loop started for {self.stream_id}")
         frame_count = 0
-        start_time = time.time()
+        # FPS window uses the monotonic clock so wall-clock adjustments
+        # (NTP on the Pi) can't skew or negate the measured interval
+        start_time = time.monotonic()
 
         while self.is_running:
             try:
@@ -156,11 +158,12 @@ class VideoStream:
                 self.stats["last_frame_time"] = time.time()
 
                 # Calculate FPS every second
-                elapsed = time.time() - start_time
+                now = time.monotonic()
+                elapsed = now - start_time
                 if elapsed >= 1.0:
                     self.stats["fps"] = frame_count / elapsed
                     frame_count = 0
-                    start_time = time.time()
+                    start_time = now
 
                 # Add frame to queue
                 try: